@@ -1,4 +1,4 @@
-import uuid
+import os
 from datetime import datetime, timezone
 
 def parse_jsonrpc(body: dict | None):
@@ -13,7 +13,9 @@ def make_task_result(rid: any, *, content: str, context_id: str, task_id: str,
                       state: str = "completed", user_echo: str | None = None,
                       artifact_name: str = "assistantResponse"):
     """Return Raven-style task envelope, always HTTP 200 safe."""
-    now = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+    now = datetime.now(timezone.utc)  # serialized as ISO-8601 `...Z` by ORJSONResponse
+    # one urandom read for every id in the envelope; ids are opaque 32-char hex
+    rnd = os.urandom(48 if user_echo is not None else 32)
     result = {
         "id": task_id,
         "contextId": context_id,
@@ -24,14 +26,14 @@ def make_task_result(rid: any, *, content: str, context_id: str, task_id: str,
                 "kind": "message",
                 "role": "agent",
                 "parts": [{"kind": "text", "text": content}],
-                "messageId": str(uuid.uuid4()),
+                "messageId": rnd[:16].hex(),
                 "taskId": None,
                 "metadata": None,
             },
         },
         "artifacts": [
             {
-                "artifactId": str(uuid.uuid4()),
+                "artifactId": rnd[16:32].hex(),
                 "name": artifact_name,
                 "parts": [{"kind": "text", "text": content}],
             }
@@ -44,7 +46,7 @@ def make_task_result(rid: any, *, content: str, context_id: str, task_id: str,
             "kind": "message",
             "role": "user",
             "parts": [{"kind": "text", "text": user_echo}],
-            "messageId": str(uuid.uuid4()),
+            "messageId": rnd[32:].hex(),
             "taskId": None,
             "metadata": None,
         })
@@ -1,17 +1,20 @@
-import re
+from collections import deque
 from html import unescape
 from typing import Any, Dict, List, Optional, Tuple
 
-_TAGS_RE = re.compile(r"<[^>]*>")
-_WS_RE   = re.compile(r"\s+")
+try:  # optional: google-re2 gives linear-time (DFA) matching on large/hostile HTML
+    import re2 as _re_engine
+except ImportError:
+    import re as _re_engine
+
+# Only the tag pattern goes through the optional engine: re2's \s is ASCII-only,
+# so whitespace is collapsed with str.split(), which knows U+00A0 and friends.
+_TAGS_RE = _re_engine.compile(r"<[^>]*>")
 
 def clean_text(raw: str) -> str:
     if not raw:
         return ""
-    s = unescape(raw)
-    s = _TAGS_RE.sub(" ", s)
-    s = _WS_RE.sub(" ", s).strip()
-    return s
+    return " ".join(_TAGS_RE.sub(" ", unescape(raw)).split())
 
 def extract_text_and_data_master(params_obj: Dict[str, Any]) -> Tuple[Optional[str], List[str], str]:
     """Prefer the LAST item in parts[1].data[*].text; fallback to parts[0].text; fallback to message.text."""
@@ -22,23 +25,34 @@ def extract_text_and_data_master(params_obj: Dict[str, Any]) -> Tuple[Optional[s
     message = (params_obj or {}).get("message") or {}
     parts = message.get("parts") or []
 
-    if len(parts) > 1 and isinstance(parts[1], dict) and parts[1].get("kind") == "data":
-        data_items = parts[1].get("data") or []
-        cleaned = []
-        for di in data_items:
+    # fast path: the common single text part
+    if len(parts) == 1 and isinstance(parts[0], dict) and parts[0].get("kind") == "text":
+        t0 = clean_text(parts[0].get("text") or "")
+        if t0:
+            return t0, [], "source=parts0"
+
+    p0 = parts[0] if parts and isinstance(parts[0], dict) else None
+    p1 = parts[1] if len(parts) > 1 and isinstance(parts[1], dict) else None
+
+    if p1 is not None and p1.get("kind") == "data":
+        # single pass; the deque keeps only the newest 20 cleaned texts
+        recent: deque = deque(maxlen=20)
+        seen = 0
+        for di in p1.get("data") or []:
             if isinstance(di, dict) and di.get("kind") == "text":
                 t = clean_text(di.get("text") or "")
                 if t:
-                    cleaned.append(t)
-        inline_hist = cleaned[-20:]
-        dbg_bits.append(f"data_text_count={len(cleaned)}")
+                    recent.append(t)
+                    seen += 1
+        inline_hist = list(recent)
+        dbg_bits.append(f"data_text_count={seen}")
         if inline_hist:
             eff_text = inline_hist[-1]
             dbg_bits.append("source=data:last")
 
     # parts[0].text
-    if not eff_text and len(parts) > 0 and isinstance(parts[0], dict) and parts[0].get("kind") == "text":
-        t0 = clean_text(parts[0].get("text") or "")
+    if not eff_text and p0 is not None and p0.get("kind") == "text":
+        t0 = clean_text(p0.get("text") or "")
         if t0:
             eff_text = t0
             dbg_bits.append("source=parts0")
@@ -55,7 +69,7 @@ def extract_text_and_data_master(params_obj: Dict[str, Any]) -> Tuple[Optional[s
 def extract_text_and_data_slave(params_obj: Dict[str, Any]) -> Tuple[Optional[str], List[str], str]:
     """Fallback extractor (un-cleaned parts0, then message.text; also collects raw data texts)."""
     eff_text = None
-    inline_hist: List[str] = []
+    recent: deque = deque(maxlen=20)
     dbg = []
 
     try:
@@ -67,12 +81,14 @@ def extract_text_and_data_slave(params_obj: Dict[str, Any]) -> Tuple[Optional[st
                 dbg.append(f"parts[0].text_len={len(eff_text or '')}")
             if len(parts) > 1 and isinstance(parts[1], dict) and parts[1].get("kind") == "data":
                 data_items = parts[1].get("data") or []
+                seen = 0
                 for di in data_items:
                     if isinstance(di, dict) and di.get("kind") == "text":
                         t = (di.get("text") or "").strip()
                         if t:
-                            inline_hist.append(t)
-                dbg.append(f"data_text_count={len(inline_hist)}")
+                            recent.append(t)
+                            seen += 1
+                dbg.append(f"data_text_count={seen}")
 
         if not eff_text:
             e = (message.get("text") or "").strip()
@@ -82,4 +98,4 @@ def extract_text_and_data_slave(params_obj: Dict[str, Any]) -> Tuple[Optional[st
     except Exception:
         pass
 
-    return eff_text, inline_hist[-20:], ";".join(dbg[:3])
+    return eff_text, list(recent), ";".join(dbg[:3])
@@ -1,39 +1,51 @@
+import asyncio
+import logging
+import re
 import uuid
 
-from fastapi import APIRouter, Body, Request
-from pydantic import BaseModel, Field
-from typing import Any, Optional, Literal, List, Dict
+from collections import deque
+from dataclasses import dataclass
+from heapq import nsmallest
+from itertools import chain
+from fastapi import APIRouter, BackgroundTasks, Depends, Request
+from pydantic import TypeAdapter, ValidationError
+from typing import Any, Optional, Literal, List, Dict, NotRequired, Tuple, TypedDict
 
 from app.a2a.jsonrpc import make_task_result, parse_jsonrpc
 from app.a2a.telex import extract_text_and_data_master, extract_text_and_data_slave
 from app.core.config import Config
 from app.core.logger import logger
+from app.core.responses import ORJSONResponse
 from app.memory.session_store import SessionStore
 from app.services import ai, coingecko as cg
 from app.services.news import get_headlines
-from app.utils.aliases import resolve_coin_id
-from app.utils.cache import get_json, set_json
+from app.utils.aliases import aliases_loaded, resolve_coin_id
+from app.utils.cache import aget_json, aget_json_many, aset_json, peek_local
 from app.utils.intent import classify, extract_coin_from_price, extract_count
 
 
-class InvokeParams(BaseModel):
-    text: str = Field(..., min_length=1)
-    channel_id: Optional[str] = None
+@dataclass(slots=True)
+class ParamsLike:
+    """Invoke params as extracted from the JSON-RPC message (no validator run)."""
+    text: str
     user_id: Optional[str] = None
     org_id: Optional[str] = None
+    channel_id: Optional[str] = None
     metadata: Optional[dict[str, Any]] = None
-    temperature: Optional[float] = Field(0.7, ge=0.0, le=1.0)
+    temperature: float = 0.7
 
-class JSONRPCResult(BaseModel):
-    type: Literal["message"] = "message"
-    format: Literal["markdown"] = "markdown"
+# Outbound envelope shapes. Typing only: handlers build plain dicts and
+# ORJSONResponse serialises them, with no model validation on the way out.
+class JSONRPCResult(TypedDict):
+    type: Literal["message"]
+    format: Literal["markdown"]
     content: str
 
-class JSONRPCResponse(BaseModel):
-    jsonrpc: Literal["2.0"] = "2.0"
+class JSONRPCResponse(TypedDict):
+    jsonrpc: Literal["2.0"]
     id: Any
-    result: Optional[JSONRPCResult] = None
-    error: Optional[dict[str, Any]] = None
+    result: NotRequired[JSONRPCResult]
+    error: NotRequired[Dict[str, Any]]
 
 # ------------------------ Constants ------------------------
 
@@ -44,88 +56,150 @@ HELP_TEXT = (
     "_All data via free public APIs. This is not financial advice._"
 )
 
-TTL_SHORT = getattr(Config, "CACHE_TTL_SHORT", 300)  # fallback to 5 minutes
+TTL_SHORT = Config.CACHE_TTL_SHORT
+TTL_NEG = Config.NEG_CACHE_TTL  # how long an unknown coin id stays known-unknown (0: never cached)
+_DEPLOYMENT_LABEL = Config.DEPLOYMENT_LABEL
+HISTORY_WINDOW = SessionStore.MAX_MESSAGES  # messages of merged (inline + stored) history handed to the model
+# Shared read-only fallback for missing dicts; only ever .get()-ed, never mutated.
+_EMPTY: Dict[str, Any] = {}
+# in-flight fire-and-forget tasks (cache writes)
+_BACKGROUND: set = set()
+
+# Built once at import; pydantic-core parses and validates the raw body in a single pass.
+_RPC_BODY = TypeAdapter(Dict[str, Any])
 
 # ------------------------ Utils ------------------------
 
 def as_result(rid: Any, content: str) -> JSONRPCResponse:
-    return JSONRPCResponse(id=rid, result=JSONRPCResult(content=content))
+    """Plain-dict JSON-RPC envelope; JSONRPCResponse only describes its shape."""
+    return {
+        "jsonrpc": "2.0",
+        "id": rid,
+        "result": {"type": "message", "format": "markdown", "content": content},
+    }
 
-def _get_session_id(req: Request, params: InvokeParams) -> str:
-    def norm(s: Optional[str]) -> str:
-        return (s or "").strip().lower().replace(" ", "_")[:128]
+_NORM_TABLE = str.maketrans({" ": "_"})
 
-    def pick(d: Optional[dict], *keys: str) -> Optional[str]:
-        if not d:
-            return None
-        lowered = {str(k).lower(): v for k, v in d.items()}
-        for k in keys:
-            v = lowered.get(k.lower())
-            if isinstance(v, (str, int)):
-                return str(v)
-        return None
-
-    user_id = norm(params.user_id)
-    org_id  = norm(params.org_id)
-    channel = norm(params.channel_id)
-
-    meta = params.metadata or {}
-    user_id = user_id or norm(pick(meta, "user_id", "userId", "user", "telex_user_id"))
-    org_id  = org_id  or norm(pick(meta, "org_id", "orgId", "organization_id",
-                                    "workspace_id", "team_id", "installation_id",
-                                    "telex_org_id"))
-
-    hdr = {k.lower(): v for k, v in req.headers.items()}
-    user_id = user_id or norm(hdr.get("x-user-id") or hdr.get("x-telex-user-id"))
-    org_id  = org_id  or norm(hdr.get("x-org-id")  or hdr.get("x-telex-org-id") or hdr.get("x-workspace-id"))
+def _norm(s: Optional[str]) -> str:
+    return (s or "").strip().translate(_NORM_TABLE).lower()[:128]
+
+_USER_KEYS = ("user_id", "userId", "user", "telex_user_id")
+_ORG_KEYS  = ("org_id", "orgId", "organization_id", "workspace_id", "team_id",
+              "installation_id", "telex_org_id")
+_USER_KEYS_LOWER = tuple(k.lower() for k in _USER_KEYS)
+_ORG_KEYS_LOWER  = tuple(k.lower() for k in _ORG_KEYS)
+
+def _pick(d: dict, keys: tuple) -> Optional[str]:
+    for k in keys:
+        v = d.get(k)
+        if isinstance(v, (str, int)):
+            return str(v)
+    return None
+
+def _get_session_id(req: Request, params: ParamsLike) -> str:
+    # explicit params win; most requests stop here
+    user_id = _norm(params.user_id)
+    org_id  = _norm(params.org_id)
+    if org_id and user_id:
+        return f"{org_id}:{user_id}"
+
+    meta = params.metadata
+    if meta:
+        # exact keys first; only lowercase the metadata keys if that misses
+        user_id = user_id or _norm(_pick(meta, _USER_KEYS))
+        org_id  = org_id  or _norm(_pick(meta, _ORG_KEYS))
+        if not (org_id and user_id):
+            lowered = {str(k).lower(): v for k, v in meta.items()}
+            user_id = user_id or _norm(_pick(lowered, _USER_KEYS_LOWER))
+            org_id  = org_id  or _norm(_pick(lowered, _ORG_KEYS_LOWER))
+        if org_id and user_id:
+            return f"{org_id}:{user_id}"
+
+    # Starlette Headers lookups are already case-insensitive
+    hdr = req.headers
+    user_id = user_id or _norm(hdr.get("x-user-id") or hdr.get("x-telex-user-id"))
+    org_id  = org_id  or _norm(hdr.get("x-org-id")  or hdr.get("x-telex-org-id") or hdr.get("x-workspace-id"))
 
     if org_id and user_id:
         return f"{org_id}:{user_id}"
 
-    sid_hdr  = norm(hdr.get("x-session-id"))
+    sid_hdr  = _norm(hdr.get("x-session-id"))
+    channel = _norm(params.channel_id)
     return user_id or org_id or sid_hdr or channel or "anonymous"
 
-def _append_history_safe(session_id: str, user_text: str, assistant_text: str) -> None:
+async def _append_history_safe(session_id: str, user_text: str, assistant_text: str) -> None:
     try:
-        SessionStore.append(session_id, user_text, assistant_text)
+        await SessionStore.append(session_id, user_text, assistant_text)
     except Exception:
         logger.exception("[history] append failed (non-fatal)")
 
-def _get_history_safe(session_id: str) -> List[Dict[str, str]]:
+async def _get_history_safe(session_id: str) -> List[Dict[str, str]]:
     try:
-        return SessionStore.get_history(session_id)
+        return await SessionStore.get_history(session_id, HISTORY_WINDOW)
     except Exception:
         logger.exception("[history] get failed (non-fatal)")
         return []
 
-def _safe_set_json(key: str, value: Any, ex: int = TTL_SHORT) -> None:
+async def _safe_set_json(key: str, value: Any, ex: int = TTL_SHORT) -> None:
     try:
-        set_json(key, value, ex=ex)
+        await aset_json(key, value, ex=ex)
     except Exception:
         logger.exception("[cache] set_json failed (non-fatal)")
 
+def _chg_24h(c: dict) -> float:
+    return c.get("price_change_percentage_24h") or 0
+
+def _fmt_top_row(item: Tuple[int, dict]) -> str:
+    i, c = item
+    price = c.get("current_price")
+    price_str = f"${price:,.2f}" if isinstance(price, (int, float)) else "N/A"
+    chg = c.get("price_change_percentage_24h")
+    chg_str = f" ({chg:+,.2f}%)" if isinstance(chg, (int, float)) else ""
+    return f"{i}. **{c.get('name') or c.get('id')} ({(c.get('symbol') or '').upper()})** — {price_str}{chg_str}"
+
 def _md_top_list(title: str, coins: list[dict]) -> str:
-    lines = []
-    for i, c in enumerate(coins, 1):
-        name = c.get("name") or c.get("id")
-        sym  = (c.get("symbol") or "").upper()
-        price = c.get("current_price")
-        chg = c.get("price_change_percentage_24h")
-        try:
-            price_str = f"${float(price):,.2f}" if price is not None else "N/A"
-        except Exception:
-            price_str = "N/A"
-        chg_str = f" ({float(chg):+,.2f}%)" if chg is not None else ""
-        lines.append(f"{i}. **{name} ({sym})** — {price_str}{chg_str}")
-    return f"**{title}**\n\n" + "\n".join(lines) + "\n\n_This is not financial advice._"
-
-def _ai_error_result(
-    rid: Any,
-    session_id: str,
-    user_text: str,
-    merged_history: list[dict[str, str]],
-    deployment_label: str,
-    temperature: float,
+    return f"**{title}**\n\n" + "\n".join(map(_fmt_top_row, enumerate(coins, 1))) + "\n\n_This is not financial advice._"
+
+@dataclass(slots=True)
+class Ctx:
+    """Per-request state handed to the intent handlers."""
+    rid: Any
+    session_id: str
+    user_text: str
+    intent: str
+    intent_match: Optional["re.Match[str]"]
+    deployment_label: str
+    temperature: float
+    history_task: "asyncio.Task[List[Dict[str, str]]]"
+    background: BackgroundTasks
+    inline_history: Optional[List[str]] = None
+    merged_history: Optional[List[Dict[str, str]]] = None
+
+def _merge_history(inline_history: Optional[List[str]], stored_history: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """Merge inline history from Telex with stored messages, newest HISTORY_WINDOW kept."""
+    if not inline_history:
+        return stored_history
+    # only inline texts that can survive the window become messages
+    room = HISTORY_WINDOW - len(stored_history)
+    inline = ({"role": "user", "content": t} for t in inline_history[-room:] if t) if room > 0 else ()
+    return list(deque(chain(inline, stored_history), maxlen=HISTORY_WINDOW))
+
+async def _history(ctx: Ctx) -> List[Dict[str, str]]:
+    """Await the history fetch started in _handle_invoke (it overlaps the handler's own IO)."""
+    if ctx.merged_history is None:
+        ctx.merged_history = _merge_history(ctx.inline_history, await ctx.history_task)
+    return ctx.merged_history
+
+async def _compose(ctx: Ctx, **kwargs: Any) -> str:
+    return await ai.compose_response(history=await _history(ctx), **kwargs)
+
+def _finish(ctx: Ctx, content: str) -> JSONRPCResponse:
+    # the history write runs after the response has been sent
+    ctx.background.add_task(_append_history_safe, ctx.session_id, ctx.user_text, content)
+    return as_result(ctx.rid, content)
+
+async def _ai_error_result(
+    ctx: Ctx,
     error: str,
     intent: str,
     requested_coin: Optional[str] = None,
@@ -133,252 +207,336 @@ def _ai_error_result(
     extra: Optional[str] = None,
 ) -> JSONRPCResponse:
     facts = {
-        "deployment_label": deployment_label,
+        "deployment_label": ctx.deployment_label,
         "intent": intent,
         "error": error,
         "requested_coin": requested_coin,
         "data_source": data_source,
         "extra": extra,
     }
-    content = ai.compose_response(
-        user_text=user_text,
-        history=merged_history,
+    content = await _compose(
+        ctx,
+        user_text=ctx.user_text,
         facts=facts,
-        temperature=temperature,
+        temperature=ctx.temperature,
     )
-    _append_history_safe(session_id, user_text, content)
-    return as_result(rid, content)
+    return _finish(ctx, content)
+
+def _spawn(coro) -> None:
+    """Fire-and-forget; keeps a strong ref so the task isn't collected mid-flight."""
+    task = asyncio.create_task(coro)
+    _BACKGROUND.add(task)
+    task.add_done_callback(_BACKGROUND.discard)
+
+async def _cached_or_fetch_price(coin: str) -> Optional[float]:
+    cache_key, neg_key = f"price:{coin}:usd", f"neg:price:{coin}"
+    # hot path: a locally held price needs no Redis at all (the marker is almost
+    # never set, so batching it would always send the pair to Redis)
+    price = peek_local(cache_key)
+    if price is not None:
+        return price
+    # otherwise price and known-unknown marker in one round-trip
+    cached = await aget_json_many([cache_key, neg_key])
+    price = cached.get(cache_key)
+    if price is None:
+        if cached.get(neg_key):
+            return None
+        price = await cg.get_price(coin, "usd")
+        if price is not None:
+            _spawn(_safe_set_json(cache_key, price, ex=300))
+        elif TTL_NEG > 0:
+            # CoinGecko answered but has no USD quote for the id; don't ask again for a while
+            _spawn(_safe_set_json(neg_key, 1, ex=TTL_NEG))
+    return price
+
+async def _resolve(maybe: Optional[str]) -> Optional[str]:
+    """resolve_coin_id inline once the alias map is loaded (a dict lookup); only
+    the cold first build, which fetches under the alias lock, goes to a thread."""
+    if aliases_loaded():
+        return resolve_coin_id(maybe)
+    return await asyncio.to_thread(resolve_coin_id, maybe)
+
+# ------------------------ Intent handlers ------------------------
+
+async def _handle_price(ctx: Ctx) -> JSONRPCResponse:
+    try:
+        # classify already captured the coin; re-scan only if it didn't
+        m = ctx.intent_match
+        coin = m.group(1) if m is not None else extract_coin_from_price(ctx.user_text)
+    except Exception:
+        logger.exception("[price] extract failed")
+        coin = None
+    coin = await _resolve(coin)
+    if not coin:
+        content = await _compose(
+            ctx,
+            user_text="User asked for a price but provided no recognized coin. Ask them to specify it clearly.",
+            facts={"deployment_label": ctx.deployment_label},
+            temperature=ctx.temperature,
+        )
+        return _finish(ctx, content)
+
+    try:
+        # the price lookup and the stored-history read run side by side
+        price, _ = await asyncio.gather(_cached_or_fetch_price(coin), _history(ctx))
+    except Exception:
+        logger.exception("[price] fetch failed")
+        content = await _compose(
+            ctx,
+            user_text=f"User asked for price of {coin} but live price could not be fetched. Apologize briefly and ask to try again.",
+            facts={"deployment_label": ctx.deployment_label, "intent": "price", "coin": coin},
+            temperature=ctx.temperature,
+        )
+        return _finish(ctx, content)
+
+    if price is None:
+        return await _ai_error_result(
+            ctx,
+            error="coin_not_found",
+            intent="price",
+            requested_coin=coin,
+            data_source="CoinGecko",
+            extra="System logic assumed the user wants to know the price of a coin, \
+                but the coin ID could not be resolved. [price fetch returned None]. \
+                This likely means the coin is unknown or invalid or misspelled or \
+                not supported or similar. The system logic could have assumed wrong so check the user text carefully.",
+        )
+
+    content = await _compose(
+        ctx,
+        user_text=ctx.user_text,
+        facts={
+            "deployment_label": ctx.deployment_label,
+            "intent": "price",
+            "coin": coin,
+            "price_usd": float(price),
+            "data_source": "CoinGecko",
+        },
+        temperature=ctx.temperature,
+    )
+    return _finish(ctx, content)
+
+async def _handle_news(ctx: Ctx) -> JSONRPCResponse:
+    try:
+        cache_key = "news:coindesk:5"
+        headlines = await aget_json(cache_key)
+        if not headlines:
+            headlines = await get_headlines(5)
+            if headlines:
+                _spawn(_safe_set_json(cache_key, headlines, ex=TTL_SHORT))
+        if headlines:
+            content = await _compose(
+                ctx,
+                user_text="Summarize these headlines for the user.",
+                facts={
+                    "deployment_label": ctx.deployment_label,
+                    "intent": "market_news",
+                    "headlines": "; ".join(headlines),
+                    "data_source": "CoinDesk RSS",
+                },
+                temperature=ctx.temperature,
+            )
+        else:
+            content = "⚠️ Couldn’t fetch headlines right now."
+    except Exception:
+        logger.exception("[news] failed")
+        content = "⚠️ Couldn’t fetch headlines right now."
+    return _finish(ctx, content)
+
+async def _handle_markets(ctx: Ctx) -> JSONRPCResponse:
+    """`top` and `worst` lists."""
+    worst = ctx.intent == "worst"
+    try:
+        n = extract_count(ctx.user_text, ctx.intent, default=10)
+    except Exception:
+        logger.exception("[markets] extract_count failed, defaulting to 10")
+        n = 10
 
-def _handle_invoke(
+    markets = None
+    try:
+        cache_key = f"markets:top:{n}"
+        markets = await aget_json(cache_key)
+        if not markets:
+            markets = await cg.get_markets(limit=n)
+            if markets:
+                _spawn(_safe_set_json(cache_key, markets, ex=TTL_SHORT))
+        if worst:
+            markets = nsmallest(n, markets or [], key=_chg_24h)
+
+        # .get, not itemgetter: a row missing a field must not sink the LLM answer
+        items = [
+            {"rank": i, "name": c.get("name"), "symbol": (c.get("symbol") or "").upper(),
+             "price": c.get("current_price"), "change_24h": c.get("price_change_percentage_24h"),
+             "market_cap": c.get("market_cap")}
+            for i, c in enumerate(markets or [], 1)
+        ]
+        facts = {
+            "deployment_label": ctx.deployment_label,
+            "intent": "worst" if worst else "top",
+            "count": n, "list": items, "data_source": "CoinGecko",
+        }
+        content = await _compose(
+            ctx,
+            user_text=ctx.user_text,
+            facts=facts,
+            temperature=ctx.temperature,
+        ) or _md_top_list(
+            "Worst {} coins (24h)".format(n) if worst else "Top {} coins by market cap".format(n),
+            markets or [],
+        )
+    except Exception:
+        logger.exception("[markets] failed, building fallback")
+        title = "Worst {} coins (24h)".format(n) if worst else "Top {} coins by market cap".format(n)
+        content = _md_top_list(title, markets or [])
+    return _finish(ctx, content)
+
+async def _handle_trending(ctx: Ctx) -> JSONRPCResponse:
+    trending = None
+    try:
+        cache_key = "trending"
+        trending = await aget_json(cache_key)
+        if not trending:
+            trending = await cg.get_trending()
+            if trending:
+                _spawn(_safe_set_json(cache_key, trending, ex=TTL_SHORT))
+        items = [
+            {"rank": i, "name": c.get("name"), "symbol": (c.get("symbol") or "").upper(),
+             "market_cap_rank": c.get("market_cap_rank")}
+            for i, c in enumerate(trending or [], 1)
+        ]
+        facts = {
+            "deployment_label": ctx.deployment_label, "intent": "trending",
+            "list": items, "data_source": "CoinGecko",
+        }
+        content = await _compose(ctx, user_text=ctx.user_text, facts=facts, temperature=ctx.temperature)
+    except Exception:
+        logger.exception("[trending] failed")
+        lines = [f"{i+1}. {c.get('name')} ({(c.get('symbol') or '').upper()})" for i, c in enumerate((trending or [])[:10])]
+        content = "**Trending coins**\n\n" + "\n".join(lines) + "\n\n_This is not financial advice._"
+    return _finish(ctx, content)
+
+async def _handle_detail(ctx: Ctx) -> JSONRPCResponse:
+    user_text = ctx.user_text
+    maybe = (user_text.split()[-1] if isinstance(user_text, str) else "").lower()
+    coin = await _resolve(maybe) or maybe
+    # per intent: an id with no /simple/price quote may still have a detail page
+    neg_key = f"neg:detail:{coin}"
+    try:
+        if await aget_json(neg_key):
+            detail = None
+        else:
+            detail = await cg.get_coin_detail(coin)
+            if detail is None and TTL_NEG > 0:  # 404 from CoinGecko, not a transport error
+                _spawn(_safe_set_json(neg_key, 1, ex=TTL_NEG))
+    except Exception:
+        logger.exception("[detail] fetch failed")
+        detail = None
+    if not detail:
+        return await _ai_error_result(
+            ctx,
+            error="coin_not_found",
+            intent="detail",
+            requested_coin=coin,
+            data_source="CoinGecko",
+            extra="System logic assumed the user wants to know the detail of a coin, \
+                but the coin ID could not be resolved. [detail fetch returned None]. \
+                This likely means the coin is unknown or invalid or misspelled or \
+                not supported or similar. The system logic could have assumed wrong so check the user text carefully.",
+        )
+
+    facts = {
+        "deployment_label": ctx.deployment_label, "intent": "detail",
+        "name": detail.get("name"), "symbol": detail.get("symbol"),
+        "price": detail.get("price"), "market_cap": detail.get("market_cap"),
+        "volume_24h": detail.get("volume_24h"), "change_24h": detail.get("change_24h"),
+        "data_source": "CoinGecko",
+    }
+    content = await _compose(ctx, user_text=user_text, facts=facts, temperature=ctx.temperature)
+    return _finish(ctx, content)
+
+async def _handle_unknown(ctx: Ctx) -> JSONRPCResponse:
+    content = await ai.fallback_answer(
+        user_text=ctx.user_text,
+        history=await _history(ctx),
+        facts={"deployment_label": ctx.deployment_label},
+        temperature=ctx.temperature,
+    )
+    return _finish(ctx, content)
+
+_HANDLERS = {
+    "price": _handle_price,
+    "news": _handle_news,
+    "top": _handle_markets,
+    "worst": _handle_markets,
+    "trending": _handle_trending,
+    "detail": _handle_detail,
+}
+
+async def _handle_invoke(
     req: Request,
     rid: Any,
     user_text: str,
-    params_like: InvokeParams,
+    params_like: ParamsLike,
     deployment_label: str,
     temperature: float,
+    background: BackgroundTasks,
     inline_history: Optional[List[str]] = None
 ) -> JSONRPCResponse:
-    # Build session + history (merge inline history from Telex with stored)
+    # Start the stored-history read now; handlers await it only once their own
+    # data fetch is done, so the two round-trips overlap.
     session_id = _get_session_id(req, params_like)
-    stored_history = _get_history_safe(session_id)
-    merged_history = stored_history
-    if inline_history:
-        merged_history = ([{"user": t, "assistant": ""} for t in inline_history] + stored_history)[-30:]
+    history_task = asyncio.create_task(_get_history_safe(session_id))
 
     # Classify
     try:
-        intent = classify(user_text)
+        intent, intent_match = classify(user_text)
     except Exception:
         logger.exception("[intent] classify failed")
-        intent = "unknown"
+        intent, intent_match = "unknown", None
 
     logger.info("[invoke-core] sid=%s intent=%s text=%r", session_id, intent, user_text)
 
-    # -------- PRICE --------
-    if intent == "price":
-        try:
-            coin = extract_coin_from_price(user_text)
-        except Exception:
-            logger.exception("[price] extract failed")
-            coin = None
-        coin = resolve_coin_id(coin)
-        if not coin:
-            content = ai.compose_response(
-                user_text="User asked for a price but provided no recognized coin. Ask them to specify it clearly.",
-                history=merged_history,
-                facts={"deployment_label": deployment_label},
-                temperature=temperature,
-            )
-            _append_history_safe(session_id, user_text, content)
-            return as_result(rid, content)
-
-        cache_key = f"price:{coin}:usd"
-        try:
-            price = get_json(cache_key)
-            if price is None:
-                price = cg.get_price(coin, "usd")
-                if price is None:
-                    return _ai_error_result(
-                        rid, session_id, user_text, merged_history, deployment_label, temperature,
-                        error="coin_not_found",
-                        intent="price",
-                        requested_coin=coin,
-                        data_source="CoinGecko",
-                        extra="System logic assumed the user wants to know the price of a coin, \
-                            but the coin ID could not be resolved. [price fetch returned None]. \
-                            This likely means the coin is unknown or invalid or misspelled or \
-                            not supported or similar. The system logic could have assumed wrong so check the user text carefully.",
-                    )
-                _safe_set_json(cache_key, price, ex=300)
-        except Exception:
-            logger.exception("[price] fetch failed")
-            content = ai.compose_response(
-                user_text=f"User asked for price of {coin} but live price could not be fetched. Apologize briefly and ask to try again.",
-                history=merged_history,
-                facts={"deployment_label": deployment_label, "intent": "price", "coin": coin},
-                temperature=temperature,
-            )
-            _append_history_safe(session_id, user_text, content)
-            return as_result(rid, content)
-
-        content = ai.compose_response(
-            user_text=user_text,
-            history=merged_history,
-            facts={
-                "deployment_label": deployment_label,
-                "intent": "price",
-                "coin": coin,
-                "price_usd": float(price),
-                "data_source": "CoinGecko",
-            },
-            temperature=temperature,
-        )
-        _append_history_safe(session_id, user_text, content)
-        return as_result(rid, content)
-
-    # -------- NEWS --------
-    if intent == "news":
-        try:
-            cache_key = "news:coindesk:5"
-            headlines = get_json(cache_key) or get_headlines(5)
-            if headlines:
-                _safe_set_json(cache_key, headlines, ex=TTL_SHORT)
-                content = ai.compose_response(
-                    user_text="Summarize these headlines for the user.",
-                    history=merged_history,
-                    facts={
-                        "deployment_label": deployment_label,
-                        "intent": "market_news",
-                        "headlines": "; ".join(headlines),
-                        "data_source": "CoinDesk RSS",
-                    },
-                    temperature=temperature,
-                )
-            else:
-                content = "⚠️ Couldn’t fetch headlines right now."
-        except Exception:
-            logger.exception("[news] failed")
-            content = "⚠️ Couldn’t fetch headlines right now."
-        _append_history_safe(session_id, user_text, content)
-        return as_result(rid, content)
-
-    # -------- TOP / WORST --------
-    if intent in ("top", "worst"):
-        try:
-            n = extract_count(user_text, default=10)
-        except Exception:
-            logger.exception("[markets] extract_count failed, defaulting to 10")
-            n = 10
-
-        try:
-            cache_key = f"markets:top:{n}"
-            markets = get_json(cache_key) or cg.get_markets(limit=n)
-            _safe_set_json(cache_key, markets, ex=TTL_SHORT)
-            if intent == "worst":
-                markets = sorted(markets or [], key=lambda x: (x.get("price_change_percentage_24h") or 0))[:n]
-
-            items = [
-                {
-                    "rank": i + 1,
-                    "name": c.get("name"),
-                    "symbol": (c.get("symbol") or "").upper(),
-                    "price": c.get("current_price"),
-                    "change_24h": c.get("price_change_percentage_24h"),
-                    "market_cap": c.get("market_cap"),
-                } for i, c in enumerate(markets or [])
-            ]
-            facts = {
-                "deployment_label": deployment_label,
-                "intent": "worst" if intent == "worst" else "top",
-                "count": n, "list": items, "data_source": "CoinGecko",
-            }
-            content = ai.compose_response(
-                user_text=user_text,
-                history=merged_history,
-                facts=facts,
-                temperature=temperature,
-            ) or _md_top_list(
-                "Worst {} coins (24h)".format(n) if intent == "worst" else "Top {} coins by market cap".format(n),
-                markets or [],
-            )
-        except Exception:
-            logger.exception("[markets] failed, building fallback")
-            title = "Worst {} coins (24h)".format(n) if intent == "worst" else "Top {} coins by market cap".format(n)
-            content = _md_top_list(title, markets or [])
-        _append_history_safe(session_id, user_text, content)
-        return as_result(rid, content)
-
-    # -------- TRENDING --------
-    if intent == "trending":
-        try:
-            cache_key = "trending"
-            trending = get_json(cache_key) or cg.get_trending()
-            _safe_set_json(cache_key, trending, ex=TTL_SHORT)
-            items = [
-                {"rank": i+1, "name": c.get("name"), "symbol": (c.get("symbol") or "").upper(),
-                 "market_cap_rank": c.get("market_cap_rank")} for i, c in enumerate(trending or [])
-            ]
-            facts = {
-                "deployment_label": deployment_label, "intent": "trending",
-                "list": items, "data_source": "CoinGecko",
-            }
-            content = ai.compose_response(user_text=user_text, history=merged_history, facts=facts, temperature=temperature)
-        except Exception:
-            logger.exception("[trending] failed")
-            lines = [f"{i+1}. {c.get('name')} ({(c.get('symbol') or '').upper()})" for i, c in enumerate((trending or [])[:10])]
-            content = "**Trending coins**\n\n" + "\n".join(lines) + "\n\n_This is not financial advice._"
-        _append_history_safe(session_id, user_text, content)
-        return as_result(rid, content)
-
-    # -------- DETAIL --------
-    if intent == "detail":
-        maybe = (user_text.split()[-1] if isinstance(user_text, str) else "").lower()
-        coin = resolve_coin_id(maybe) or maybe
-        try:
-            detail = cg.get_coin_detail(coin)
-        except Exception:
-            logger.exception("[detail] fetch failed")
-            detail = None
-        if not detail:
-            return _ai_error_result(
-                rid, session_id, user_text, merged_history, deployment_label, temperature,
-                error="coin_not_found",
-                intent="detail",
-                requested_coin=coin,
-                data_source="CoinGecko",
-                extra="System logic assumed the user wants to know the detail of a coin, \
-                    but the coin ID could not be resolved. [detail fetch returned None]. \
-                    This likely means the coin is unknown or invalid or misspelled or \
-                    not supported or similar. The system logic could have assumed wrong so check the user text carefully.",
-            )
-
-        facts = {
-            "deployment_label": deployment_label, "intent": "detail",
-            "name": detail.get("name"), "symbol": detail.get("symbol"),
-            "price": detail.get("price"), "market_cap": detail.get("market_cap"),
-            "volume_24h": detail.get("volume_24h"), "change_24h": detail.get("change_24h"),
-            "data_source": "CoinGecko",
-        }
-        content = ai.compose_response(user_text=user_text, history=merged_history, facts=facts, temperature=temperature)
-        _append_history_safe(session_id, user_text, content)
-        return as_result(rid, content)
-
-    # -------- Unknown --------
-    content = ai.fallback_answer(
+    ctx = Ctx(
+        rid=rid,
+        session_id=session_id,
         user_text=user_text,
-        history=merged_history,
-        facts={"deployment_label": deployment_label},
+        intent=intent,
+        intent_match=intent_match,
+        deployment_label=deployment_label,
         temperature=temperature,
+        history_task=history_task,
+        background=background,
+        inline_history=inline_history,
     )
-    _append_history_safe(session_id, user_text, content)
-    return as_result(rid, content)
+    handler = _HANDLERS.get(intent, _handle_unknown)
+    try:
+        return await handler(ctx)
+    finally:
+        if not history_task.done():
+            history_task.cancel()
+
+async def _rpc_body(req: Request) -> Dict[str, Any]:
+    """Lenient JSON-RPC body: anything that is not a JSON object becomes `{}` (no 422s)."""
+    try:
+        return _RPC_BODY.validate_json(await req.body())
+    except ValidationError:
+        logger.warning("[invoke] body is not a JSON object; treating as empty")
+        return {}
+
+def _log_response(resp: Dict[str, Any]) -> None:
+    """One-line summary at INFO; the full envelope (a second serialisation) only at DEBUG."""
+    status = resp["result"]["status"]
+    logger.info("[response] rid=%s state=%s content_len=%d",
+                resp["id"], status["state"], len(status["message"]["parts"][0]["text"]))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[response] Agent response=%s", resp)
 
 # ------------------------ Router ------------------------
 
 router = APIRouter()
 
-@router.post("/invoke", tags=["a2a"])
-def invoke(req: Request, body: Any = Body(default_factory=dict)):
+@router.post("/invoke", tags=["a2a"], response_model=None, response_class=ORJSONResponse)
+async def invoke(req: Request, background_tasks: BackgroundTasks, body: Dict[str, Any] = Depends(_rpc_body)):
     logger.info("[invoke] Agent called with request body=%r", body)
     try:
         rid, method, params = parse_jsonrpc(body)
@@ -391,8 +549,8 @@ def invoke(req: Request, body: Any = Body(default_factory=dict)):
                 state="completed",
                 user_echo=None,
             )
-            logger.info("[response] Agent response=%s", resp)            
-            return resp
+            _log_response(resp)
+            return ORJSONResponse(resp)
 
         # ---------- Telex A2A shape ----------
         if method == "message/send":
@@ -405,17 +563,18 @@ def invoke(req: Request, body: Any = Body(default_factory=dict)):
                     state="failed",
                     user_echo=None,
                 )
-                logger.info("[response] Agent response=%s", resp)            
-                return resp
+                _log_response(resp)
+                return ORJSONResponse(resp)
 
             # Log brief snapshot of Telex parts
-            message = (params or {}).get("message") or {}
+            message = params.get("message") or _EMPTY
             context_id = message.get("taskId") or str(uuid.uuid4())
             task_id    = message.get("messageId") or str(uuid.uuid4())
             parts = message.get("parts") or []
 
-            logger.info("[telex] parts_count=%s kinds=%s",
-                    len(parts), [p.get("kind") for p in parts[:3] if isinstance(p, dict)])
+            if logger.isEnabledFor(logging.INFO):  # skip building the kinds list when muted
+                logger.info("[telex] parts_count=%s kinds=%s",
+                        len(parts), [p.get("kind") for p in parts[:3] if isinstance(p, dict)])
 
             text, inline_hist, dbg = extract_text_and_data_master(params)
             if not text:
@@ -430,46 +589,44 @@ def invoke(req: Request, body: Any = Body(default_factory=dict)):
                     state="completed",
                     user_echo="",
                 )
-                logger.info("[response] Agent response=%s", resp)            
-                return resp
+                _log_response(resp)
+                return ORJSONResponse(resp)
 
-            meta = (params or {}).get("metadata") or {}
+            meta = params.get("metadata") or _EMPTY
             deployment_label = (
                 req.headers.get("X-Deployment-Label")
                 or meta.get("deployment_label")
-                or Config.DEPLOYMENT_LABEL
+                or _DEPLOYMENT_LABEL
             )
             temperature = 0.7
-            params_like = InvokeParams(
-                text=text, user_id=None, org_id=None, channel_id=None,
-                metadata=meta, temperature=temperature
-            )
+            params_like = ParamsLike(text=text, metadata=meta, temperature=temperature)
 
             logger.info("[telex] dbg=%s", dbg)
-            resp = _handle_invoke(
+            resp = await _handle_invoke(
                 req=req,
                 rid=rid,
                 user_text=text,
                 params_like=params_like,
                 deployment_label=deployment_label,
                 temperature=temperature,
+                background=background_tasks,
                 inline_history=inline_hist,
             )
-            if resp and resp.result and isinstance(resp.result, dict) and "content" in resp.result:
-                content = resp.result["content"]
-            elif resp and resp.result and hasattr(resp.result, "content"):
-                content = resp.result.content
+            result = resp.get("result") or _EMPTY
+            error = resp.get("error")
+            if "content" in result:
+                content = result["content"]
             else:
-                content = (resp.error or {}).get("message", "Sorry, I couldn’t process that just now.")
+                content = (error or _EMPTY).get("message", "Sorry, I couldn’t process that just now.")
 
-            state = "failed" if resp and resp.error else "completed"
+            state = "failed" if error else "completed"
 
             resp = make_task_result(
                 rid, content=content, context_id=context_id, task_id=task_id,
                 state=state, user_echo=text
             )
-            logger.info("[response] Agent response=%s", resp)            
-            return resp
+            _log_response(resp)
+            return ORJSONResponse(resp)
 
         resp = make_task_result(
             rid,
@@ -479,8 +636,8 @@ def invoke(req: Request, body: Any = Body(default_factory=dict)):
             state="failed",
             user_echo=None,
         )
-        logger.info("[response] Agent response=%s", resp)            
-        return resp
+        _log_response(resp)
+        return ORJSONResponse(resp)
 
     except Exception:
         logger.exception("[invoke] unhandled error")
@@ -492,16 +649,16 @@ def invoke(req: Request, body: Any = Body(default_factory=dict)):
             state="failed",
             user_echo=None,
         )
-        logger.info("[response] Agent response=%s", resp)            
-        return resp
+        _log_response(resp)
+        return ORJSONResponse(resp)
 
-@router.post("/help", tags=["a2a"])
-def help_rpc():
-    return make_task_result(
+@router.post("/help", tags=["a2a"], response_model=None, response_class=ORJSONResponse)
+async def help_rpc():
+    return ORJSONResponse(make_task_result(
         rid="",
         content=HELP_TEXT,
         context_id=str(uuid.uuid4()),
         task_id=str(uuid.uuid4()),
         state="completed",
         user_echo=None,
-    )
+    ))
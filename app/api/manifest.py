@@ -1,5 +1,7 @@
-from fastapi import APIRouter, Request
-from fastapi.responses import JSONResponse
+from functools import lru_cache
+
+import orjson
+from fastapi import APIRouter, Request, Response
 from app.core.config import Config
 
 router = APIRouter()
@@ -34,12 +36,22 @@ def _build_manifest(base_url: str) -> dict:
         }
     }
 
+# base_url comes from the Host header, so the per-host cache is bounded
+@lru_cache(maxsize=32)
+def _manifest_bytes(base_url: str) -> bytes:
+    return orjson.dumps(_build_manifest(base_url))
+
+def _manifest_response(req: Request) -> Response:
+    return Response(
+        content=_manifest_bytes(str(req.base_url)),
+        media_type="application/json",
+        headers={"Cache-Control": "public, max-age=300"},
+    )
+
 @router.get("/agent.json", include_in_schema=False)
 async def agent_json(req: Request):
-    manifest = _build_manifest(str(req.base_url))
-    return JSONResponse(content=manifest, headers={"Cache-Control": "public, max-age=300"})
+    return _manifest_response(req)
 
 @router.get("/.well-known/agent.json", include_in_schema=False)
 async def agent_json_wellknown(req: Request):
-    manifest = _build_manifest(str(req.base_url))
-    return JSONResponse(content=manifest, headers={"Cache-Control": "public, max-age=300"})
+    return _manifest_response(req)
@@ -6,13 +6,17 @@ load_dotenv()
 class Config:
     HOST = os.getenv("HOST", "0.0.0.0")
     PORT = int(os.getenv("PORT", "8012"))
+    # uvicorn worker processes. os.cpu_count() is the host's, not the container's
+    # quota, and each worker builds its own alias map at startup, so scale
+    # explicitly via WEB_CONCURRENCY
+    WORKERS = int(os.getenv("WEB_CONCURRENCY", "1"))
 
     # CoinGecko (free public API)
     COINGECKO_API_URL = os.getenv("COINGECKO_API_URL", "https://api.coingecko.com/api/v3")
     COINGECKO_TIMEOUT = float(os.getenv("COINGECKO_TIMEOUT", "10"))
     ALIAS_TTL = int(os.getenv("ALIAS_TTL", "3600"))
 
-    # News (RSS via feedparser)
+    # News (rss2json, falling back to parsing the RSS feed directly)
     COINDESK_RSS = os.getenv("COINDESK_RSS", "https://www.coindesk.com/arc/outboundfeeds/rss/")
     RSS2JSON_API_URL = os.getenv("RSS2JSON_API_URL", "https://api.rss2json.com/v1/api.json")
 
@@ -24,6 +28,8 @@ class Config:
     REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
     REDIS_ENABLED = bool(REDIS_URL)
     CACHE_TTL_SHORT = int(os.getenv("CACHE_TTL_SHORT", "300"))
+    # how long CoinGecko's "unknown coin" answers are remembered; 0 disables
+    NEG_CACHE_TTL = int(os.getenv("NEG_CACHE_TTL", "600"))
     CHAT_HISTORY_TTL = int(os.getenv("CHAT_HISTORY_TTL", "86400")) 
 
     # Azure OpenAI
@@ -33,6 +39,8 @@ class Config:
     AZURE_OPENAI_DEPLOYMENT = os.getenv("AZURE_OPENAI_DEPLOYMENT", "")
     MAX_TOKENS = int(os.getenv("MAX_TOKENS", "200"))
     TEMPERATURE = float(os.getenv("TEMPERATURE", "0.7"))
+    # in-flight completions per worker; keeps bursts under the deployment's RPM/TPM limits
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
 
     # Prompts
     PROMPT_DIR = os.getenv("PROMPT_DIR", "app/prompts")
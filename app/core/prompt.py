@@ -1,11 +1,21 @@
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from functools import lru_cache
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
 from app.core.config import Config
 
+# Templates never change at runtime: no mtime checks, and the compiled bytecode
+# is shared on disk so each uvicorn worker skips recompiling on start-up.
 _env = Environment(
     loader=FileSystemLoader(Config.PROMPT_DIR),
-    autoescape=select_autoescape()
+    autoescape=select_autoescape(),
+    auto_reload=False,
+    cache_size=50,
+    bytecode_cache=FileSystemBytecodeCache(),
 )
+_tpl = _env.get_template(Config.PROMPT_FILE)
+
+@lru_cache(maxsize=16)
 def render_system_prompt(deployment_label) -> str:
-    tpl = _env.get_template(Config.PROMPT_FILE)
+    """Rendered once per label; the template is static for the life of the process."""
     deployment_reference = f" integrated on {deployment_label}" if deployment_label else ""
-    return tpl.render(DEPLOYMENT_REFERENCE=deployment_reference)
+    return _tpl.render(DEPLOYMENT_REFERENCE=deployment_reference)
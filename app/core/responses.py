@@ -0,0 +1,19 @@
+from typing import Any
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (native datetime/UUID support, UTC as `Z`)."""
+
+    def render(self, content: Any) -> bytes:
+        try:
+            return orjson.dumps(
+                content,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z | orjson.OPT_SERIALIZE_NUMPY,
+            )
+        except orjson.JSONEncodeError:
+            # e.g. a client-chosen JSON-RPC id beyond 64 bits; the stdlib encoder copes
+            return super().render(jsonable_encoder(content))
@@ -1,57 +1,70 @@
-import json
+import orjson
 from typing import List, Dict
-from app.utils.redis_client import redis_client as _redis
+from app.utils.redis_client import aioredis_client as _redis
 from app.core.config import Config
 from app.core.logger import logger
 
+# read once at import; <= 0 means history never expires
+_TTL = int(Config.CHAT_HISTORY_TTL) if Config.CHAT_HISTORY_TTL else 0
+
 class SessionStore:
-    """Handles chat history storage and retrieval in Redis."""
-    PREFIX = "history:"
+    """Handles chat history storage and retrieval in Redis (asyncio client).
+
+    History is stored as OpenAI chat messages ({"role", "content"}), one list
+    entry per message, so it can be handed to the model without reshaping.
+    """
+    PREFIX = "history:v2:"
+    MAX_MESSAGES = 60  # 30 user/assistant turns
 
     @classmethod
     def _key(cls, session_id: str) -> str:
         return f"{cls.PREFIX}{session_id}"
 
     @classmethod
-    def append(cls, session_id: str, user_msg: str, assistant_msg: str) -> None:
+    async def append(cls, session_id: str, user_msg: str, assistant_msg: str) -> None:
         key = cls._key(session_id)
         if not _redis:
             logger.warning("[history] redis_client is None; skipping persistence")
             return
         try:
-            turn = json.dumps({"user": user_msg, "assistant": assistant_msg}, ensure_ascii=False)
-            _redis.rpush(key, turn)
-            ttl_cfg = getattr(Config, "CHAT_HISTORY_TTL", None)
-            try:
-                ttl = int(ttl_cfg) if ttl_cfg is not None else None
-            except Exception:
-                ttl = None
-
-            if ttl is None or ttl <= 0:
-                _redis.persist(key)
-            else:
-                _redis.expire(key, ttl)
+            msgs = [
+                orjson.dumps({"role": role, "content": text}).decode()
+                for role, text in (("user", user_msg.strip()), ("assistant", (assistant_msg or "").strip()))
+                if text
+            ]
+            if not msgs:
+                return
+
+            # one round-trip for push + trim + ttl
+            async with _redis.pipeline(transaction=False) as pipe:
+                pipe.rpush(key, *msgs)
+                pipe.ltrim(key, -cls.MAX_MESSAGES, -1)
+                if _TTL <= 0:
+                    pipe.persist(key)
+                else:
+                    pipe.expire(key, _TTL)
+                await pipe.execute()
         except Exception as e:
             logger.exception("[history] append failed: %s", e)
 
-    
     @classmethod
-    def get_history(cls, session_id: str) -> List[Dict]:
+    async def get_history(cls, session_id: str, n: int = 0) -> List[Dict[str, str]]:
+        """Return the last `n` stored messages (all of them when `n` is 0)."""
         key = cls._key(session_id)
         if not _redis:
             logger.warning("[history] redis_client is None; get skipped")
             return []
         try:
-            raw = _redis.lrange(key, 0, -1)
-            return [json.loads(item) for item in raw] if raw else []
+            raw = await _redis.lrange(key, -n if n else 0, -1)
+            return [orjson.loads(item) for item in raw] if raw else []
         except Exception as e:
             logger.exception("[history] get failed: %s", e)
             return []
 
     @classmethod
-    def clear(cls, session_id: str) -> None:
+    async def clear(cls, session_id: str) -> None:
         key = cls._key(session_id)
         try:
-            _redis.delete(key)
+            await _redis.delete(key)
         except Exception as e:
             logger.exception("[history] clear failed: %s", e)
\ No newline at end of file
@@ -1,37 +1,46 @@
-from openai import AzureOpenAI
+import asyncio
+
+from openai import AsyncAzureOpenAI
 from typing import List, Optional, Dict, Any
 from app.core.config import Config
 from app.core.logger import logger
 from app.core.prompt import render_system_prompt
 
-_client: Optional[AzureOpenAI] = None
-def _client_once() -> AzureOpenAI:
+# bound once at import; Config is static for the life of the process
+_DEPLOYMENT = Config.AZURE_OPENAI_DEPLOYMENT
+_TEMP = Config.TEMPERATURE
+_MAX = Config.MAX_TOKENS
+# Chat completions can't be merged into one upstream call, so bursts are
+# smoothed by bounding concurrency rather than by holding requests to batch them.
+_LLM_SLOTS = asyncio.Semaphore(Config.LLM_MAX_CONCURRENCY)
+
+_client: Optional[AsyncAzureOpenAI] = None
+def _client_once() -> AsyncAzureOpenAI:
     global _client
     if _client is None:
         try:
-            _client = AzureOpenAI(
+            _client = AsyncAzureOpenAI(
                 api_key=Config.AZURE_OPENAI_API_KEY,
                 api_version=Config.AZURE_OPENAI_API_VERSION,
                 azure_endpoint=Config.AZURE_OPENAI_ENDPOINT,
             )
         except Exception:
-            logger.exception("Failed to create AzureOpenAI client")
+            logger.exception("Failed to create AsyncAzureOpenAI client")
             raise
     return _client
 
 def _mk_messages(deployment_label: Optional[str], user_text: str, history: Optional[List[Dict[str, str]]], facts: Optional[Dict[str, Any]]) -> List[Dict[str, str]]:
-    system = render_system_prompt(deployment_label)
-    messages: List[Dict[str, str]] = [{"role": "system", "content": system}]
+    """Build the chat payload, most stable part first.
 
+    system prompt -> stored history -> [FACTS] -> user text. The system prompt is
+    byte-identical per deployment label and history only grows at the end, so
+    consecutive turns share a long prefix that Azure OpenAI's prompt cache can
+    reuse; everything that changes per request goes last.
+    """
+    # history is already in chat-message form and windowed by the caller
+    messages: List[Dict[str, str]] = [{"role": "system", "content": render_system_prompt(deployment_label)}]
     if history:
-        recent = history[-30:]
-        for turn in recent:
-            u = (turn.get("user") or "").strip()
-            a = (turn.get("assistant") or "").strip()
-            if u:
-                messages.append({"role": "user", "content": u})
-            if a:
-                messages.append({"role": "assistant", "content": a})
+        messages += history
 
     if facts:
         facts_lines = ["[FACTS]"]
@@ -47,29 +56,29 @@ def _mk_messages(deployment_label: Optional[str], user_text: str, history: Optio
     messages.append({"role": "user", "content": user_text})
     return messages
 
-def compose_response(
+async def compose_response(
     user_text: str,
     history: Optional[List[Dict[str, str]]] = None,
     facts: Optional[Dict[str, Any]] = None,
-    temperature: float = Config.TEMPERATURE,
-    max_tokens: int = Config.MAX_TOKENS,
+    temperature: float = _TEMP,
+    max_tokens: int = _MAX,
 ) -> str:
-    client = _client_once()
     deployment_label = (facts or {}).get("deployment_label") or ""
     messages = _mk_messages(deployment_label, user_text, history, facts)
     try:
-        resp = client.chat.completions.create(
-            model=Config.AZURE_OPENAI_DEPLOYMENT,
-            messages=messages,
-            temperature=temperature,
-            max_tokens=max_tokens,
-        )
-        content = (resp.choices[0].message.content or "").strip()
-        return content
+        client = _client_once()
+        async with _LLM_SLOTS:
+            resp = await client.chat.completions.create(
+                model=_DEPLOYMENT,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
+        return (resp.choices[0].message.content or "").strip()
     except Exception:
         logger.exception("compose_response failed")
         return "Sorry, I couldn’t process that just now."
 
-def fallback_answer(user_text: str, history: Optional[List[Dict[str, str]]] = None, facts: Optional[Dict[str, Any]] = None, temperature: float = 0.6) -> str:
-    return compose_response(user_text=user_text, history=history, facts=facts, temperature=temperature, max_tokens=220)
+async def fallback_answer(user_text: str, history: Optional[List[Dict[str, str]]] = None, facts: Optional[Dict[str, Any]] = None, temperature: float = 0.6) -> str:
+    return await compose_response(user_text=user_text, history=history, facts=facts, temperature=temperature, max_tokens=220)
     
\ No newline at end of file
@@ -1,19 +1,28 @@
-import requests
-from typing import Any, Dict, List, Optional
+import orjson
+from typing import Any, Dict, List, Optional, Sequence
 from app.core.config import Config
+from app.utils.cache import cached
+from app.utils.http_client import async_http
 
 BASE = Config.COINGECKO_API_URL
 TO   = Config.COINGECKO_TIMEOUT
 
-def get_price(coin_id: str, vs: str = "usd") -> Optional[float]:
+async def get_prices(coin_ids: Sequence[str], vs: str = "usd") -> Dict[str, float]:
+    """Prices for several coins in one /simple/price call; unknown ids are left out."""
+    if not coin_ids:
+        return {}
     url = f"{BASE}/simple/price"
-    r = requests.get(url, params={"ids": coin_id, "vs_currencies": vs}, timeout=TO)
+    r = await async_http.get(url, params={"ids": ",".join(coin_ids), "vs_currencies": vs}, timeout=TO)
     r.raise_for_status()
-    return r.json().get(coin_id, {}).get(vs)
+    data = orjson.loads(r.content)
+    return {cid: quote[vs] for cid, quote in data.items() if quote.get(vs) is not None}
 
-def get_markets(limit: int = 10) -> List[Dict[str, Any]]:
+async def get_price(coin_id: str, vs: str = "usd") -> Optional[float]:
+    return (await get_prices([coin_id], vs)).get(coin_id)
+
+async def get_markets(limit: int = 10) -> List[Dict[str, Any]]:
     url = f"{BASE}/coins/markets"
-    r = requests.get(url, params={
+    r = await async_http.get(url, params={
         "vs_currency": "usd",
         "order": "market_cap_desc",
         "per_page": limit,
@@ -22,13 +31,13 @@ def get_markets(limit: int = 10) -> List[Dict[str, Any]]:
         "price_change_percentage": "24h"
     }, timeout=TO)
     r.raise_for_status()
-    return r.json()
+    return orjson.loads(r.content)
 
-def get_trending() -> List[Dict[str, Any]]:
+async def get_trending() -> List[Dict[str, Any]]:
     url = f"{BASE}/search/trending"
-    r = requests.get(url, timeout=TO)
+    r = await async_http.get(url, timeout=TO)
     r.raise_for_status()
-    coins = r.json().get("coins", [])
+    coins = orjson.loads(r.content).get("coins", [])
     # normalize a minimal shape
     out = []
     for c in coins:
@@ -42,13 +51,14 @@ def get_trending() -> List[Dict[str, Any]]:
         })
     return out
 
-def get_coin_detail(coin_id: str) -> Dict[str, Any] | None:
+@cached(ttl=300)
+async def get_coin_detail(coin_id: str) -> Dict[str, Any] | None:
     url = f"{BASE}/coins/{coin_id}"
-    r = requests.get(url, params={"localization":"false","tickers":"false","community_data":"false","developer_data":"false","sparkline":"false"}, timeout=TO)
+    r = await async_http.get(url, params={"localization":"false","tickers":"false","community_data":"false","developer_data":"false","sparkline":"false"}, timeout=TO)
     if r.status_code == 404:
         return None
     r.raise_for_status()
-    data = r.json()
+    data = orjson.loads(r.content)
     md = data.get("market_data", {})
     return {
         "id": data.get("id"),
@@ -1,14 +1,21 @@
-import requests
-import feedparser
+from itertools import islice
+
+import orjson
+from lxml import etree
 from typing import List, Optional
 from app.core.config import Config
+from app.utils.http_client import async_http
+
+_RSS_ACCEPT = {"Accept": "application/rss+xml, application/xml;q=0.9, */*;q=0.8"}
+# libxml2 parser: tolerant of sloppy feeds, never expands entities or touches the network
+_RSS_PARSER = etree.XMLParser(recover=True, huge_tree=False, resolve_entities=False, no_network=True)
 
 
-def _via_rss2json(limit: int) -> Optional[List[str]]:
+async def _via_rss2json(limit: int) -> Optional[List[str]]:
     try:
-        r = requests.get(Config.RSS2JSON_API_URL, params={"rss_url": Config.COINDESK_RSS}, timeout=6)
+        r = await async_http.get(Config.RSS2JSON_API_URL, params={"rss_url": Config.COINDESK_RSS}, timeout=6)
         r.raise_for_status()
-        data = r.json()
+        data = orjson.loads(r.content)
         items = data.get("items") or data.get("articles") or []
         if not items:
             return None
@@ -16,18 +23,19 @@ def _via_rss2json(limit: int) -> Optional[List[str]]:
     except Exception:
         return None
 
-def _via_feedparser(limit: int) -> Optional[List[str]]:
+async def _via_rss(limit: int) -> Optional[List[str]]:
     try:
         # fetch HTML ourselves to survive 308 redirects
-        rr = requests.get(Config.COINDESK_RSS, timeout=6, allow_redirects=True)
+        rr = await async_http.get(Config.COINDESK_RSS, headers=_RSS_ACCEPT, timeout=6, follow_redirects=True)
         rr.raise_for_status()
-        feed = feedparser.parse(rr.text)
-        entries = getattr(feed, "entries", []) or []
-        if not entries:
+        # bytes straight to libxml2 (it honours the XML encoding declaration)
+        root = etree.fromstring(rr.content, parser=_RSS_PARSER)
+        if root is None:
             return None
-        return [e.title for e in entries[:limit] if getattr(e, "title", None)]
+        titles = (t.text.strip() for t in root.iterfind(".//item/title") if t.text and t.text.strip())
+        return list(islice(titles, limit)) or None
     except Exception:
         return None
 
-def get_headlines(limit: int = 5) -> Optional[List[str]]:
-    return _via_rss2json(limit) or _via_feedparser(limit)
+async def get_headlines(limit: int = 5) -> Optional[List[str]]:
+    return await _via_rss2json(limit) or await _via_rss(limit)
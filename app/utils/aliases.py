@@ -1,62 +1,190 @@
-import requests
+import hashlib
+import re
 import threading
+import time
 
-from typing import Dict, Optional
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+import ijson
+import orjson
 
 from app.core.config import Config
 from app.core.logger import logger
 from app.utils.cache import get_json, set_json
+from app.utils.http_client import http_session
 
 
-_CACHE_KEY = "coin_aliases:v1"
+_CACHE_KEY = "coin_aliases:v3"  # v3: also keyed by alphanumeric-only forms
 _LOCK = threading.Lock()
-_DEFAULT_TTL = getattr(Config, "ALIAS_TTL", 3600)
+_DEFAULT_TTL = Config.ALIAS_TTL
+# everything that isn't a letter or digit (any script), in one C-level pass;
+# an ASCII punctuation table would miss e.g. curly quotes and dashes
+_NON_ALNUM = re.compile(r"[\W_]+")
+# Read-copy-update: readers take whatever (monotonic expiry, alias map) tuple is
+# current without locking; a refresh builds a new map and swaps the reference.
+# _LOCK only serialises refreshes. Expiry is half the Redis TTL so a worker never
+# serves a copy much older than the shared one.
+_CURRENT: Tuple[float, Dict[str, str]] = (0.0, {})
+_RETRY_AFTER = 60  # seconds to keep serving a stale map after a failed refresh
+_LIST_STATE_TTL = 7 * 24 * 3600  # ETag + derived aliases; only ever revalidated
+
+def _add(aliases: Dict[str, str], alias: str, cid: str) -> None:
+    aliases.setdefault(alias, cid)
+    stripped = _NON_ALNUM.sub("", alias)
+    if stripped and stripped != alias:
+        aliases.setdefault(stripped, cid)
+
+def _add_coin(aliases: Dict[str, str], c: dict) -> None:
+    # CoinGecko ids and symbols are already lowercase; only names need folding
+    cid = c.get("id")
+    if not cid:
+        return
+    sym = c.get("symbol")
+    nm = c.get("name")
+    if sym: _add(aliases, sym, cid)
+    if nm:  _add(aliases, nm.lower(), cid)
+
+def _list_aliases() -> Dict[str, str]:
+    """Aliases from /coins/list, revalidated with If-None-Match.
+
+    The list rarely changes between refreshes, so the last ETag is kept in the
+    shared cache together with the aliases derived from that body; a 304 reuses
+    them and skips the ~1MB download and parse.
+    """
+    url = f"{Config.COINGECKO_API_URL}/coins/list"
+    # versioned with _CACHE_KEY: the stored aliases are derived by _add_coin, so
+    # a change there must not be masked by 304s for the life of the entry
+    state_key = f"cg:etag:{_CACHE_KEY}:{hashlib.blake2b(url.encode(), digest_size=8).hexdigest()}"
+    state = get_json(state_key)
+    headers = {"If-None-Match": state["etag"]} if isinstance(state, dict) else None
+
+    # /coins/list is ~15k coins: stream it so each coin dict is dropped as soon
+    # as its aliases are in, instead of materialising the whole list first
+    with http_session.get(
+        url,
+        headers=headers,
+        timeout=Config.COINGECKO_TIMEOUT,
+        stream=True,
+    ) as r:
+        if r.status_code == 304 and headers:
+            logger.info("[aliases] /coins/list not modified")
+            return state["aliases"]
+        r.raise_for_status()
+        r.raw.decode_content = True  # let urllib3 undo gzip/deflate
+        aliases: Dict[str, str] = {}
+        for c in ijson.items(r.raw, "item"):
+            _add_coin(aliases, c)
+        etag = r.headers.get("ETag")
+
+    if etag:
+        set_json(state_key, {"etag": etag, "aliases": aliases}, ex=_LIST_STATE_TTL)
+    return aliases
 
 def _fetch_aliases() -> Dict[str, str]:
     aliases: Dict[str, str] = {}
     try:
-        r = requests.get(
+        r = http_session.get(
             f"{Config.COINGECKO_API_URL}/coins/markets",
             params={"vs_currency": "usd", "order": "market_cap_desc", "per_page": 250, "page": 1},
-            timeout=getattr(Config, "COINGECKO_TIMEOUT", 10),
+            timeout=Config.COINGECKO_TIMEOUT,
         )
         r.raise_for_status()
-        for c in r.json() or []:
-            cid = (c.get("id") or "").lower()
-            sym = (c.get("symbol") or "").lower()
-            nm  = (c.get("name") or "").lower()
-            if cid:
-                if sym: aliases.setdefault(sym, cid)
-                if nm:  aliases.setdefault(nm,  cid)
-
-        r2 = requests.get(f"{Config.COINGECKO_API_URL}/coins/list", timeout=getattr(Config, "COINGECKO_TIMEOUT", 10))
-        r2.raise_for_status()
-        for c in r2.json() or []:
-            cid = (c.get("id") or "").lower()
-            sym = (c.get("symbol") or "").lower()
-            nm  = (c.get("name") or "").lower()
-            if cid:
-                if sym: aliases.setdefault(sym, cid)
-                if nm:  aliases.setdefault(nm,  cid)
+        for c in orjson.loads(r.content) or []:
+            _add_coin(aliases, c)
+
+        # markets entries win; the long tail only fills in aliases not yet taken
+        for alias, cid in _list_aliases().items():
+            aliases.setdefault(alias, cid)
 
         logger.info("[aliases] built %d entries", len(aliases))
     except Exception:
         logger.exception("[aliases] fetch failed")
     return aliases
 
-def get_aliases() -> Dict[str, str]:
+# Top coins by market cap, so resolution works before the first build lands
+# (cold start) or when CoinGecko is unreachable. (id, symbol, name)
+_SEED_COINS = (
+    ("bitcoin", "btc", "bitcoin"), ("ethereum", "eth", "ethereum"),
+    ("tether", "usdt", "tether"), ("binancecoin", "bnb", "bnb"),
+    ("solana", "sol", "solana"), ("usd-coin", "usdc", "usdc"),
+    ("ripple", "xrp", "xrp"), ("dogecoin", "doge", "dogecoin"),
+    ("cardano", "ada", "cardano"), ("tron", "trx", "tron"),
+    ("avalanche-2", "avax", "avalanche"), ("shiba-inu", "shib", "shiba inu"),
+    ("chainlink", "link", "chainlink"), ("polkadot", "dot", "polkadot"),
+    ("bitcoin-cash", "bch", "bitcoin cash"), ("litecoin", "ltc", "litecoin"),
+    ("the-open-network", "ton", "toncoin"), ("stellar", "xlm", "stellar"),
+    ("near", "near", "near protocol"), ("matic-network", "matic", "polygon"),
+)
+_SEED: Dict[str, str] = {}
+for _cid, _sym, _nm in _SEED_COINS:
+    _add(_SEED, _sym, _cid)
+    _add(_SEED, _nm, _cid)
+
+def _swap(aliases: Dict[str, str], ttl: float = _DEFAULT_TTL / 2) -> Dict[str, str]:
+    global _CURRENT
+    _CURRENT = (time.monotonic() + ttl, aliases)
+    return aliases
+
+def _load() -> Dict[str, str]:
+    """Shared copy if another worker built one, else a fresh build. Caller holds _LOCK."""
     cached = get_json(_CACHE_KEY)
     if isinstance(cached, dict) and cached:
-        return cached
+        return _swap(cached)
+    aliases = _fetch_aliases()
+    if aliases:
+        set_json(_CACHE_KEY, aliases, ex=_DEFAULT_TTL)
+        return _swap(aliases)
+    return {}
+
+def _refresh_in_background() -> None:
+    """Runs on its own thread with _LOCK already acquired by the caller."""
+    try:
+        if not _load():
+            _swap(_CURRENT[1], ttl=_RETRY_AFTER)
+    except Exception:
+        logger.exception("[aliases] background refresh failed")
+        _swap(_CURRENT[1], ttl=_RETRY_AFTER)
+    finally:
+        _LOCK.release()
+
+def get_aliases() -> Dict[str, str]:
+    expires, current = _CURRENT
+    if current:
+        # stale-while-revalidate: the first reader past expiry starts one refresh,
+        # everyone (including it) keeps getting the current map meanwhile
+        if time.monotonic() >= expires and _LOCK.acquire(blocking=False):
+            threading.Thread(target=_refresh_in_background, name="alias-refresh", daemon=True).start()
+        return current
+
+    if _LOCK.locked():
+        # first build still running (startup warm-up); don't queue behind it
+        return _SEED
 
     with _LOCK:
-        cached = get_json(_CACHE_KEY)
-        if isinstance(cached, dict) and cached:
-            return cached
-        aliases = _fetch_aliases()
-        if aliases:
-            set_json(_CACHE_KEY, aliases, ex=_DEFAULT_TTL)
-        return aliases or {}
+        current = _CURRENT[1]
+        if current:
+            return current
+        current = _load()
+        if not current:
+            # first build failed: serve the seed for _RETRY_AFTER, then the warm
+            # path above retries from the background thread
+            current = _swap(_SEED, ttl=_RETRY_AFTER)
+        return current
+
+def aliases_loaded() -> bool:
+    """True once a map (or the post-failure seed) is in place; from then on
+    get_aliases never blocks: stale maps are refreshed on a background thread."""
+    return bool(_CURRENT[1])
+
+@lru_cache(maxsize=1024)
+def _alias_keys(maybe: str) -> Tuple[str, str]:
+    """Lookup keys for a user token: lowercased, and lowercased alphanumerics only.
+
+    Only the pure normalisation is memoized; the alias map itself refreshes on a TTL.
+    """
+    key = maybe.strip().lower()
+    return key, _NON_ALNUM.sub("", key)
 
 def resolve_coin_id(maybe: str) -> Optional[str]:
     """
@@ -65,12 +193,7 @@ def resolve_coin_id(maybe: str) -> Optional[str]:
     """
     if not maybe:
         return None
-    key = maybe.strip().lower()
-    aliases = get_aliases()
-    cid = aliases.get(key)
-    if cid:
-        return cid
-    key2 = "".join(ch for ch in key if ch.isalnum())
-    if key2 != key:
-        return aliases.get(key2)
-    return None
+    key, key2 = _alias_keys(maybe)
+    aliases = get_aliases() or _SEED
+    # stripped forms are in the map too (see _add), so this is at most two dict hits
+    return aliases.get(key) or aliases.get(key2)
@@ -1,14 +1,36 @@
+import functools
+import hashlib
 import time
-import json
-from typing import Any, Optional
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
 
-from .redis_client import redis_client
+import orjson
+import zstandard
+from cachetools import TLRUCache
 
+from .redis_client import aioredis_client, redis_client
+
+
+# Values over _COMPRESS_MIN bytes of JSON (the alias map, market lists) are stored
+# zstd-compressed behind a b"Z" marker; JSON text can never start with "Z".
+_COMPRESS_MIN = 1024
+_ZMARK = b"Z"
+
+def _encode(value: Any) -> bytes:
+    raw = orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    if len(raw) > _COMPRESS_MIN:
+        return _ZMARK + zstandard.compress(raw, 3)
+    return raw
+
+def _decode(raw: bytes) -> Any:
+    if raw[:1] == _ZMARK:
+        raw = zstandard.decompress(raw[1:])
+    return orjson.loads(raw)
 
 # very small in-memory TTL cache as fallback
-_mem: dict[str, tuple[float, str]] = {}
+_mem: dict[str, tuple[float, bytes]] = {}
 
-def _mem_get(key: str) -> Optional[str]:
+def _mem_get(key: str) -> Optional[bytes]:
     if key not in _mem:
         return None
     exp, val = _mem[key]
@@ -17,25 +39,150 @@ def _mem_get(key: str) -> Optional[str]:
         return None
     return val
 
-def _mem_set(key: str, value: str, ex: Optional[int]) -> None:
+def _mem_set(key: str, value: bytes, ex: Optional[int]) -> None:
     _mem[key] = (time.time() + ex if ex else 0, value)
 
+# Process-local copy of hot Redis keys, so repeat reads skip the socket and the
+# JSON decode. Entries live for the key's remaining Redis TTL, capped at
+# _LOCAL_MAX_TTL so writes from other workers show up within that window.
+# Values are shared between callers: treat them as read-only.
+_LOCAL_MAX_TTL = 60.0
+_local: TLRUCache = TLRUCache(maxsize=1024, ttu=lambda _key, entry, _now: entry[0])
+_local_lock = threading.Lock()
+
+def _local_put(key: str, value: Any, ttl: Optional[float]) -> None:
+    ttl = min(ttl, _LOCAL_MAX_TTL) if ttl and ttl > 0 else _LOCAL_MAX_TTL
+    with _local_lock:
+        _local[key] = (time.monotonic() + ttl, value)
+
+def _local_get(key: str) -> Optional[tuple[float, Any]]:
+    with _local_lock:
+        return _local.get(key)
+
+def peek_local(key: str) -> Optional[Any]:
+    """The process-local copy of `key`, or None; never touches Redis."""
+    entry = _local_get(key)
+    return entry[1] if entry is not None else None
+
 def get_json(key: str) -> Optional[Any]:
     if redis_client:
+        entry = _local_get(key)
+        if entry is not None:
+            return entry[1]
         try:
-            raw = redis_client.get(key)
-            return json.loads(raw) if raw else None
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.get(key)
+            pipe.pttl(key)
+            raw, pttl = pipe.execute()
+            if not raw:
+                return None
+            value = _decode(raw)
+            _local_put(key, value, pttl / 1000 if pttl > 0 else None)
+            return value
         except Exception:
             pass
     raw = _mem_get(key)
-    return json.loads(raw) if raw else None
+    return _decode(raw) if raw else None
 
 def set_json(key: str, value: Any, ex: Optional[int] = None) -> None:
-    raw = json.dumps(value)
+    raw = _encode(value)
     if redis_client:
         try:
             redis_client.set(key, raw, ex=ex)
+            _local_put(key, value, ex)
+            return
+        except Exception:
+            pass
+    _mem_set(key, raw, ex)
+
+def _mem_fill(keys: List[str], out: Dict[str, Any]) -> None:
+    for key in keys:
+        if key not in out:
+            raw = _mem_get(key)
+            if raw:
+                out[key] = _decode(raw)
+
+def _local_hits(keys: List[str], out: Dict[str, Any]) -> None:
+    with _local_lock:
+        for key in keys:
+            entry = _local.get(key)
+            if entry is not None:
+                out[key] = entry[1]
+
+# ---- asyncio variants (same local layer and encoding, non-blocking Redis I/O) ----
+
+async def aget_json(key: str) -> Optional[Any]:
+    if aioredis_client:
+        entry = _local_get(key)
+        if entry is not None:
+            return entry[1]
+        try:
+            async with aioredis_client.pipeline(transaction=False) as pipe:
+                pipe.get(key)
+                pipe.pttl(key)
+                raw, pttl = await pipe.execute()
+            if not raw:
+                return None
+            value = _decode(raw)
+            _local_put(key, value, pttl / 1000 if pttl > 0 else None)
+            return value
+        except Exception:
+            pass
+    raw = _mem_get(key)
+    return _decode(raw) if raw else None
+
+async def aset_json(key: str, value: Any, ex: Optional[int] = None) -> None:
+    raw = _encode(value)
+    if aioredis_client:
+        try:
+            await aioredis_client.set(key, raw, ex=ex)
+            _local_put(key, value, ex)
             return
         except Exception:
             pass
     _mem_set(key, raw, ex)
+
+async def aget_json_many(keys: List[str]) -> Dict[str, Any]:
+    """Batch aget_json: present keys only, with one Redis round-trip for all local misses."""
+    out: Dict[str, Any] = {}
+    if aioredis_client:
+        _local_hits(keys, out)
+        missing = [k for k in keys if k not in out]
+        if not missing:
+            return out
+        try:
+            async with aioredis_client.pipeline(transaction=False) as pipe:
+                for key in missing:
+                    pipe.get(key)
+                    pipe.pttl(key)
+                replies = await pipe.execute()
+            for key, raw, pttl in zip(missing, replies[::2], replies[1::2]):
+                if raw:
+                    value = out[key] = _decode(raw)
+                    _local_put(key, value, pttl / 1000 if pttl > 0 else None)
+            return out
+        except Exception:
+            pass
+    _mem_fill(keys, out)
+    return out
+
+T = TypeVar("T")
+
+def cached(ttl: int, prefix: str = "cg") -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """Cache an async fetcher's non-None results for `ttl` seconds, keyed on its arguments."""
+    def deco(fn: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            digest = hashlib.blake2b(
+                orjson.dumps([args, sorted(kwargs.items())]), digest_size=8
+            ).hexdigest()
+            key = f"{prefix}:{fn.__name__}:{digest}"
+            hit = await aget_json(key)
+            if hit is not None:
+                return hit
+            result = await fn(*args, **kwargs)
+            if result is not None:
+                await aset_json(key, result, ttl)
+            return result
+        return wrapper
+    return deco
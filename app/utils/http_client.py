@@ -0,0 +1,47 @@
+"""Shared HTTP clients for outbound API calls (CoinGecko, news feeds)."""
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app.core.config import Config
+
+# Pooled keep-alive connections: repeat calls to the same host skip the TCP+TLS
+# handshake. Failed connects and transient 5xx are retried; read timeouts are not
+# (a hung upstream would cost 3x the timeout), and a 429 from the free CoinGecko
+# tier comes with a long Retry-After, so retrying into it just burns more quota.
+_RETRY = Retry(
+    total=2,
+    connect=2,
+    read=0,
+    status=2,
+    backoff_factor=0.2,
+    status_forcelist=(500, 502, 503, 504),
+    raise_on_status=False,
+)
+_ADAPTER = HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=_RETRY)
+
+_HEADERS = {
+    "User-Agent": f"{Config.AGENT_NAME.replace(' ', '')}/{Config.AGENT_VERSION}",
+    "Accept": "application/json",
+}
+
+# sync session: only for code that already runs in a worker thread (alias build)
+http_session = requests.Session()
+http_session.mount("https://", _ADAPTER)
+http_session.mount("http://", _ADAPTER)
+http_session.headers.update(_HEADERS)
+
+# asyncio client for request handlers: HTTP/2 multiplexes concurrent calls to
+# the same host over one connection. httpx only retries failed connects (not
+# statuses). Closed by the app's shutdown hook.
+async_http = httpx.AsyncClient(
+    timeout=Config.COINGECKO_TIMEOUT,
+    headers=_HEADERS,
+    transport=httpx.AsyncHTTPTransport(
+        http2=True,
+        retries=2,
+        limits=httpx.Limits(max_keepalive_connections=16, max_connections=32),
+    ),
+)
@@ -1,37 +1,60 @@
 import re
+from functools import lru_cache
+from typing import Optional, Tuple
 
-PRICE_RE = re.compile(r"(?:price|worth|value|rate)\s+of\s+([\w\-]+)", re.I)
-TOP_RE   = re.compile(r"(?:top|best)\s+(\d{1,2})?\s*(?:coins|cryptos?)", re.I)
-WORST_RE = re.compile(r"(?:worst|losers?)\s+(\d{1,2})?\s*(?:coins|cryptos?)", re.I)
-TREND_RE = re.compile(r"(?:trending|hot)\s+(\d{1,2})?\s*(?:coins|cryptos?)", re.I)
+# Possessive quantifiers (Python 3.11+): the pieces they join can't overlap
+# (\s vs letters/digits), so giving up backtracking changes no match, but runs
+# of whitespace or word chars in hostile input can no longer be re-scanned.
+PRICE_RE = re.compile(r"(?:price|worth|value|rate)\s++of\s++([\w\-]++)", re.I)
+TOP_RE   = re.compile(r"(?:top|best)\s++(\d{1,2})?+\s*+(?:coins|cryptos?)", re.I)
+WORST_RE = re.compile(r"(?:worst|losers?)\s++(\d{1,2})?+\s*+(?:coins|cryptos?)", re.I)
+TREND_RE = re.compile(r"(?:trending|hot)\s++(\d{1,2})?+\s*+(?:coins|cryptos?)", re.I)
+# only the head of a message is classified; intents are stated up front
+MAX_SCAN = 512
+# regex-matched intents, in priority order (news beats all of these, detail loses to them)
+_ORDERED = (("price", PRICE_RE), ("top", TOP_RE), ("worst", WORST_RE), ("trending", TREND_RE))
 
-def classify(text: str) -> str:
-    t = text.lower()
+# The helpers below are pure functions of the message head, so repeated prompts
+# ("price of btc") are served from an LRU cache. The caches are keyed on
+# text[:MAX_SCAN] (all that is ever scanned), never on the full, unbounded text.
+
+def classify(text: str) -> Tuple[str, Optional[re.Match]]:
+    """(intent, match); for "price" the match's group(1) is the lowercased coin token."""
+    return _classify(text[:MAX_SCAN])
+
+@lru_cache(maxsize=4096)
+def _classify(head: str) -> Tuple[str, Optional[re.Match]]:
+    t = head.lower()
     if "news" in t or "headline" in t:
-        return "news"
-    if PRICE_RE.search(t):
-        return "price"
-    if TOP_RE.search(t):
-        return "top"
-    if WORST_RE.search(t):
-        return "worst"
-    if TREND_RE.search(t):
-        return "trending"
+        return "news", None
+    for intent, rx in _ORDERED:
+        m = rx.search(t)
+        if m:
+            return intent, m
     if "detail" in t or "info" in t:
-        return "detail"
-    return "unknown"
+        return "detail", None
+    return "unknown", None
 
 def extract_coin_from_price(text: str) -> str | None:
-    m = PRICE_RE.search(text)
+    return _extract_coin(text[:MAX_SCAN])
+
+@lru_cache(maxsize=4096)
+def _extract_coin(head: str) -> str | None:
+    m = PRICE_RE.search(head)
     return m.group(1).lower() if m else None
 
-def extract_count(text: str, default: int = 10) -> int:
-    for rx in (TOP_RE, WORST_RE, TREND_RE):
-        m = rx.search(text)
-        if m:
-            try:
-                n = int(m.group(1)) if m.group(1) else default
-                return max(1, min(50, n))
-            except Exception:
-                return default
-    return default
+_COUNT_RES = {"top": TOP_RE, "worst": WORST_RE, "trending": TREND_RE}
+
+def extract_count(text: str, intent: str, default: int = 10) -> int:
+    """N from "top N coins" etc.; only the regex for the already classified intent is run."""
+    return _extract_count(text[:MAX_SCAN], intent, default)
+
+@lru_cache(maxsize=4096)
+def _extract_count(head: str, intent: str, default: int) -> int:
+    rx = _COUNT_RES.get(intent)
+    m = rx.search(head) if rx else None
+    if not m:
+        return default
+    # group(1) is \d{1,2} or None, so int() cannot raise here
+    digits = m.group(1)
+    return max(1, min(50, int(digits))) if digits else default
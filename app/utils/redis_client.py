@@ -1,6 +1,9 @@
 """Redis client for the application."""
 
+import socket
+
 import redis
+import redis.asyncio as aioredis
 from app.core.config import Config
 from app.core.logger import logger
 
@@ -10,12 +13,48 @@ REDIS_DB = Config.REDIS_DB
 REDIS_PASSWORD = Config.REDIS_PASSWORD
 REDIS_URL = Config.REDIS_URL
 
+# Shared by both clients: TCP keepalive so idle pooled sockets aren't silently
+# dropped by NATs/load balancers, and a PING before reusing a connection that
+# has been idle for 30s so a dead one is replaced instead of failing a request.
+# (RESP parsing uses hiredis automatically when it is installed.)
+_KEEPALIVE_OPTS = {
+    getattr(socket, name): val
+    for name, val in (("TCP_KEEPIDLE", 60), ("TCP_KEEPINTVL", 30), ("TCP_KEEPCNT", 3))
+    if hasattr(socket, name)  # not all of these exist on macOS
+}
+_CONN_KW = dict(
+    socket_keepalive=True,
+    socket_keepalive_options=_KEEPALIVE_OPTS,
+    health_check_interval=30,
+)
+# Both clients use blocking pools: under a burst, callers wait up to 2s for a
+# free connection instead of opening unbounded sockets (or, with the plain
+# asyncio pool, failing with "Too many connections" past the cap)
+_MAX_CONNECTIONS = 64
+_POOL_TIMEOUT = 2
+
 redis_client = None
+# asyncio twin of `redis_client` (same target, also raw bytes), for coroutine callers
+aioredis_client = None
 
 if REDIS_URL:
     try:
-        redis_client = redis.from_url(REDIS_URL, decode_responses=True)
+        # raw bytes: cache values may be zstd-compressed (see app.utils.cache)
+        redis_client = redis.Redis(connection_pool=redis.BlockingConnectionPool.from_url(
+            REDIS_URL,
+            max_connections=_MAX_CONNECTIONS,
+            timeout=_POOL_TIMEOUT,
+            decode_responses=False,
+            **_CONN_KW,
+        ))
         redis_client.ping()
+        aioredis_client = aioredis.Redis.from_pool(aioredis.BlockingConnectionPool.from_url(
+            REDIS_URL,
+            max_connections=_MAX_CONNECTIONS,
+            timeout=_POOL_TIMEOUT,
+            decode_responses=False,
+            **_CONN_KW,
+        ))
         logger.info("✅ Connected to Redis via URL: %s", REDIS_URL)
     except Exception as e:
         logger.warning("⚠️  Redis URL connection failed: %s", e)
@@ -23,14 +62,27 @@ if REDIS_URL:
 
 if not redis_client:
     try:
-        redis_client = redis.Redis(
+        redis_client = redis.Redis(connection_pool=redis.BlockingConnectionPool(
             host=REDIS_HOST,
             port=REDIS_PORT,
             db=REDIS_DB,
             password=REDIS_PASSWORD or None,
-            decode_responses=True,
-        )
+            max_connections=_MAX_CONNECTIONS,
+            timeout=_POOL_TIMEOUT,
+            decode_responses=False,
+            **_CONN_KW,
+        ))
         redis_client.ping()
+        aioredis_client = aioredis.Redis.from_pool(aioredis.BlockingConnectionPool(
+            host=REDIS_HOST,
+            port=REDIS_PORT,
+            db=REDIS_DB,
+            password=REDIS_PASSWORD or None,
+            max_connections=_MAX_CONNECTIONS,
+            timeout=_POOL_TIMEOUT,
+            decode_responses=False,
+            **_CONN_KW,
+        ))
         logger.info(
             "✅ Connected to Redis via host=%s port=%s db=%s (password=%s)",
             REDIS_HOST,
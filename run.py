@@ -1,11 +1,20 @@
+import asyncio
+
 from fastapi import FastAPI
 from app.api.health import router as health_router
 from app.api.a2a_routes import router as a2a_router
 from app.api.manifest import router as manifest_router
 from app.utils.aliases import get_aliases
 from app.core.logger import logger
+from app.core.responses import ORJSONResponse
+from app.utils.http_client import async_http
+from app.utils.redis_client import aioredis_client
 
-app = FastAPI(title="CryptoSage A2A (FastAPI)", version="1.0.0")
+app = FastAPI(
+    title="CryptoSage A2A (FastAPI)",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+)
 
 # routers
 app.include_router(health_router, prefix="")
@@ -16,7 +25,34 @@ app.include_router(manifest_router, prefix="")
 def root():
     return {"name": "CryptoSage A2A", "status": "ok"}
 
-try:
-    get_aliases()
-except Exception as e:
-    logger.error(f"[create_app] failed to warm alias cache: {e}", exc_info=True)
+async def _warm_aliases():
+    try:
+        await asyncio.to_thread(get_aliases)
+    except Exception as e:
+        logger.error(f"[startup] failed to warm alias cache: {e}", exc_info=True)
+
+@app.on_event("startup")
+async def _start_alias_warmup():
+    # in the background: the server binds immediately and /health answers while
+    # the alias map builds; resolve_coin_id uses a seed map until it lands
+    app.state.alias_warmup = asyncio.create_task(_warm_aliases())
+
+@app.on_event("shutdown")
+async def _close_clients():
+    await async_http.aclose()
+    if aioredis_client:
+        await aioredis_client.aclose()
+
+if __name__ == "__main__":
+    import uvicorn
+    from app.core.config import Config
+
+    uvicorn.run(
+        "run:app",
+        host=Config.HOST,
+        port=Config.PORT,
+        loop="uvloop",
+        http="httptools",
+        workers=Config.WORKERS,
+        log_level="info",
+    )